@@ -15,23 +15,38 @@ from __future__ import annotations
 
 import argparse
 import base64
+import functools
+import hashlib
+import io
 import json
 import logging
+import random
+import re
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterator, Optional, TypeVar
 
-import requests
-from dotenv import load_dotenv
+import orjson
 import os
 
+# requests, python-dotenv, Pillow und tenacity werden erst in den Funktionen
+# importiert, die sie brauchen: --help und Argumentfehler starten so ohne
+# deren Import-Kosten (allein requests samt urllib3/certifi ~50 ms).
+if TYPE_CHECKING:
+    import requests
+
+    from tenacity import RetryCallState
+
 # ---------------------------------------------------------------------------
 # Logging-Konfiguration
 # ---------------------------------------------------------------------------
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
+    format="%(asctime)s [%(levelname)s] [%(threadName)s] %(message)s",
     handlers=[
         logging.FileHandler("digitize_board.log", encoding="utf-8"),
         logging.StreamHandler(sys.stdout),
@@ -39,6 +54,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 # ---------------------------------------------------------------------------
 # Board-Kontext-Templates
 # ---------------------------------------------------------------------------
@@ -96,6 +113,183 @@ Gib am Ende eine Gesamteinschätzung deiner Erkennungsqualität ab (0-100%) und
 CONFIDENCE_SECTION = """
 - Unsichere Erkennungen → mit [?] markieren und Konfidenz in Prozent angeben: [?] (Konfidenz: 65%)"""
 
+# Gemeinsamer, unveränderlicher Prompt-Anfang der Text-Schritte (3+4). Steht als
+# System-Nachricht mit cache_control vorne, damit Provider mit Prompt-Caching
+# (Anthropic, Gemini via OpenRouter) den Präfix zwischen den Calls wiederverwenden.
+CACHED_SYSTEM_PREFIX = """Du bist ein Experte für die Aufbereitung digitalisierter Workshop-Boards und Metaplan-Wände.
+Du erhältst die Strukturanalyse und die Transkription eines Boards und bereitest sie gemäß der Aufgabe in der Nutzer-Nachricht auf.
+Antworte in Markdown und erfinde keine Inhalte, die nicht auf dem Board stehen."""
+
+CLEANUP_RULES = (
+    "1. Löse Abkürzungen auf (NUR wenn Kontext eindeutig, sonst belassen)\n"
+    "2. Sortiere Einträge absteigend nach Votes/Stimmen (falls vorhanden)\n"
+    "3. Entferne Farb-Annotationen wenn inhaltlich irrelevant (Noise Reduction)\n"
+    "4. Reduziere Klebepunkte auf Zahlenwerte: '(3 rote Punkte, 1 grün)' → '(4 Stimmen)'\n"
+    "5. Behalte die Markdown-Struktur (##, *) bei\n"
+)
+
+COMBINED_VISION_PROMPT = """Führe Schritt 1 (STRUKTURANALYSE) und Schritt 2 (TRANSKRIPTION) in einem Durchgang durch.
+- Strukturanalyse: Layout-Typ, Farb-Semantik, Voting-Punkte und Verbindungen, präzise und strukturiert.
+- Transkription: ALLE Zettel/Karten 1:1, inklusive Tippfehler und Abkürzungen. Nutze die erkannte Struktur als Gliederung (## für Spalten/Cluster, * für Zettel). Annotiere Voting-Punkte und relevante Farben. Schließe mit der Qualitätseinschätzung ab.
+
+Antworte ausschließlich mit einem JSON-Objekt ohne weiteren Text:
+{"structure": "<Strukturanalyse als Markdown>", "transcription": "<Transkription als Markdown>"}"""
+
+GROUP_VISION_PROMPT = """Du erhältst {count} Fotos verschiedener Boards (Bild 1 bis Bild {count}). Bearbeite jedes Bild für sich, ohne Inhalte zwischen den Boards zu vermischen.
+Führe für jedes Bild Schritt 1 (STRUKTURANALYSE) und Schritt 2 (TRANSKRIPTION) durch:
+- Strukturanalyse: Layout-Typ, Farb-Semantik, Voting-Punkte und Verbindungen, präzise und strukturiert.
+- Transkription: ALLE Zettel/Karten 1:1, inklusive Tippfehler und Abkürzungen. Nutze die erkannte Struktur als Gliederung (## für Spalten/Cluster, * für Zettel). Annotiere Voting-Punkte und relevante Farben. Schließe mit der Qualitätseinschätzung ab.
+
+Antworte für jedes Bild in Reihenfolge mit einer eigenen Trennzeile ---BOARD-n--- (n = Bildnummer), direkt gefolgt von genau einem JSON-Objekt ohne weiteren Text:
+---BOARD-1---
+{{"structure": "<Strukturanalyse als Markdown>", "transcription": "<Transkription als Markdown>"}}"""
+
+GROUP_DELIMITER_PATTERN = re.compile(r"^\s*---BOARD-(\d+)---\s*$", re.MULTILINE)
+
+# ---------------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------------
+
+B64_BLOCK_SIZE = 3 * 64 * 1024  # Vielfaches von 3 → Base64-Blöcke ohne Padding
+
+_MIME_MAP = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Liest einen Retry-After-Header (Sekunden oder HTTP-Datum) als Wartezeit in Sekunden."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _estimate_tokens(text: str) -> int:
+    """Grobe Token-Schätzung (~4 Zeichen pro Token bei deutschem Text)."""
+    return len(text) // 4 + 1
+
+
+def _b64encode_stream(stream: BinaryIO, size: int, hasher: Optional[Any] = None) -> str:
+    """
+    Base64-kodiert einen Datei-Stream blockweise in einen vorab allokierten Puffer.
+
+    Die Rohdaten liegen so nie komplett im Speicher, nur ein Block und das
+    Ergebnis. Die Blockgröße ist ein Vielfaches von 3, damit die Teilstücke
+    ohne Padding aneinanderpassen. Ändert sich die Datei nach stat(), wird
+    der Puffer gekürzt bzw. am Ende angehängt statt vorab allokiert.
+
+    Ein optionaler hasher (z.B. hashlib.sha256()) bekommt jeden gelesenen
+    Block, sodass der Inhalts-Hash ohne zweiten Durchlauf anfällt.
+    """
+    encoded = bytearray(4 * ((size + 2) // 3))
+    pos = 0
+    with memoryview(encoded) as view:
+        while block := stream.read(B64_BLOCK_SIZE):
+            if hasher is not None:
+                hasher.update(block)
+            chunk = base64.b64encode(block)
+            if pos + len(chunk) > len(view):
+                break  # Datei ist gewachsen; Rest ohne vorab allokierten Puffer
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+    if block:
+        del encoded[pos:]
+        encoded += chunk
+        while block := stream.read(B64_BLOCK_SIZE):
+            if hasher is not None:
+                hasher.update(block)
+            encoded += base64.b64encode(block)
+    elif pos != len(encoded):  # Datei ist seit stat() geschrumpft
+        del encoded[pos:]
+    return encoded.decode("ascii")
+
+
+def _write_atomic(path: Path, data: str | bytes) -> None:
+    """
+    Schreibt eine Datei atomar: erst in eine temporäre Datei, dann per os.replace.
+
+    Bei Abbruch (Strg+C, Absturz) bleibt so entweder die alte oder die neue
+    Datei stehen, nie eine halb geschriebene. Der Temp-Name ist pro Thread
+    eindeutig, damit parallele Schreiber derselben Datei sich nicht stören.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, str):
+            tmp_path.write_text(data, encoding="utf-8")
+        else:
+            tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _context_section_for(template: str, context: str) -> str:
+    """Erstellt den Kontext-Abschnitt für den System-Prompt aus Template und Zusatz-Kontext."""
+    template_text = BOARD_TEMPLATES.get(template, "")
+
+    if template == "custom" and context:
+        template_text = f"Board-Kontext: {context}"
+    elif context:
+        template_text = f"{template_text}\n\nZusätzlicher Kontext: {context}"
+
+    if template_text:
+        return f"Board-Kontext:\n{template_text}\n"
+    return ""
+
+
+def _iter_sse_events(response: requests.Response) -> Iterator[dict]:
+    """Liest die JSON-Events eines Server-Sent-Events-Streams bis "[DONE]"."""
+    for line in response.iter_lines():
+        # Leerzeilen trennen Events, ":"-Zeilen sind Keep-Alive-Kommentare von OpenRouter
+        if not line.startswith(b"data:"):
+            continue
+        data = line[len(b"data:"):].strip()
+        if data == b"[DONE]":
+            break
+        yield orjson.loads(data)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Entscheidet, ob ein Fehler vorübergehend ist und ein Retry lohnt."""
+    import requests
+
+    transient = (
+        requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.ChunkedEncodingError,  # Stream mittendrin abgebrochen
+        requests.exceptions.InvalidJSONError,  # z.B. HTML-Fehlerseite eines Proxys mit HTTP 200
+    )
+    if isinstance(exc, transient):
+        return True
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+
+class UnrecoverableError(RuntimeError):
+    """API-Fehler, den weder ein Retry noch ein Modellwechsel beheben kann."""
+
+
+class VisionUnsupportedError(UnrecoverableError):
+    """HTTP 400 wegen Bild-Input: Modell kann keine (oder nicht so viele) Bilder verarbeiten."""
+
+
+class CancelledError(RuntimeError):
+    """Verarbeitung wurde abgebrochen (z.B. Strg+C); es starten keine neuen API-Calls."""
+
+
 # ---------------------------------------------------------------------------
 # Hauptklasse
 # ---------------------------------------------------------------------------
@@ -109,12 +303,29 @@ class BoardDigitizer:
     2. Rohdaten-Transkription (_Raw.md)
     3. Bereinigung & Anreicherung
     4. Synthese / Executive Summary (_Summary.md)
+
+    Schritte 1 und 2 laufen als ein gemeinsamer Vision-Call
+    (analyze_and_transcribe); getrennte Calls nur als Rückfallebene.
+    Schritt 3 ist standardmäßig Teil der Synthese; nur mit
+    save_intermediate läuft er separat und schreibt _Clean.md.
     """
 
     API_URL = "https://openrouter.ai/api/v1/chat/completions"
     SUPPORTED_FORMATS = {".jpg", ".jpeg", ".png", ".webp"}
     MAX_RETRIES = 3
-    RETRY_BASE_DELAY = 2  # Sekunden (exponential backoff)
+    RETRY_BASE_DELAY = 1.0  # Sekunden (Untergrenze für Backoff mit Jitter)
+    RETRY_MAX_DELAY = 30.0  # Sekunden (Obergrenze für Backoff mit Jitter)
+    TOTAL_DEADLINE = 300.0  # Sekunden je API-Call über alle Modelle; danach kein neuer Versuch
+    STAGE_JITTER = (0.1, 0.5)  # Sekunden Zufallspause beim Eintritt in eine Pipeline-Stufe
+    # Token-Budget je Schritt, gedeckelt auf max_tokens (MAX_TOKENS). Die Transkription
+    # bekommt immer das volle max_tokens, der kombinierte Vision-Call max_tokens plus
+    # "analyze" (höchstens MAX_OUTPUT_TOKENS); kurze Schritte enden so früher und günstiger.
+    MAX_TOKENS_PER_STEP = {
+        "analyze": 600,
+        "clean": 2500,  # Mindestwert; wächst mit der Länge der Rohdaten
+        "summary": 1800,
+    }
+    MAX_OUTPUT_TOKENS = 8192  # Ausgabe-Limit gängiger Vision-Modelle; Obergrenze für Vision-Calls
 
     def __init__(
         self,
@@ -126,6 +337,13 @@ class BoardDigitizer:
         template: str = "custom",
         context: str = "",
         confidence: bool = False,
+        concurrency: int = 1,
+        max_dim: int = 1600,
+        jpeg_quality: int = 85,
+        detail: str = "",
+        cache: bool = True,
+        group_size: int = 1,
+        save_intermediate: bool = False,
     ) -> None:
         self.api_key = api_key
         self.model = model
@@ -135,6 +353,36 @@ class BoardDigitizer:
         self.template = template
         self.context = context
         self.confidence = confidence
+        self.concurrency = concurrency
+        self.max_dim = max_dim
+        self.jpeg_quality = jpeg_quality
+        self.detail = detail
+        self.cache = cache
+        self.group_size = group_size
+        self.save_intermediate = save_intermediate
+        self._cache_dir = output_dir / ".cache"
+
+        # Prompt-Bausteine hängen nur von der Konfiguration ab → einmal pro Instanz bauen
+        self._context_section = _context_section_for(template, context)
+        self._system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+            context_section=self._context_section,
+            confidence_section=CONFIDENCE_SECTION if confidence else "",
+        )
+        template_hint = BOARD_TEMPLATES.get(template, "")
+        self._template_hint = f"Template-Kontext: {template_hint}" if template_hint else ""
+
+        # Begrenzt parallele API-Calls und teilt Rate-Limit-Backoff zwischen Threads
+        self._api_slots = threading.BoundedSemaphore(concurrency)
+        self._backoff_lock = threading.Lock()
+        self._backoff_until = 0.0
+        self._thread_local = threading.local()
+        # Abbruch-Signal für laufende Worker: keine neuen Versuche, kein Fallback-Modell
+        self._cancelled = threading.Event()
+        # Schreibt Ausgabe-Dateien, während die Pipeline weiterarbeitet
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+        # Strukturanalyse parallel zur Transkription, wenn der kombinierte Call scheitert.
+        # Langlebige Threads, damit deren Sessions (Keep-Alive) wiederverwendet werden.
+        self._vision_split = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="vision-split")
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -142,170 +390,735 @@ class BoardDigitizer:
     # Interne Hilfsmethoden
     # ------------------------------------------------------------------
 
-    def _encode_image(self, image_path: Path) -> tuple[str, str]:
+    def _cache_key(self, *parts: str | bytes) -> str:
+        """Bildet einen SHA-256-Cache-Key über alle Teile."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[dict]:
+        """Liest einen Cache-Eintrag; None bei Cache-Miss oder unlesbarer Datei."""
+        path = self._cache_dir / f"{key}.json"
+        try:
+            return orjson.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def _cache_put(self, key: str, value: dict) -> None:
+        """Schreibt einen Cache-Eintrag."""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self._cache_dir / f"{key}.json", orjson.dumps(value))
+
+    def _encode_image(self, image_path: Path) -> tuple[str, str, str]:
         """
-        Kodiert ein Bild als Base64-String.
+        Kodiert ein Bild als Base64-String (mit Disk-Cache, Key = Bildinhalt + Einstellungen).
 
         Returns:
-            Tuple (base64_string, mime_type)
-        """
-        suffix = image_path.suffix.lower()
-        mime_map = {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".webp": "image/webp",
-        }
-        mime_type = mime_map.get(suffix, "image/jpeg")
+            Tuple (base64_string, mime_type, digest), siehe _encode_image_uncached()
+        """
+        if not self.cache:
+            return self._encode_image_uncached(image_path)
 
+        file_hash = hashlib.sha256()
         with open(image_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode("utf-8")
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(block)
+
+        cache_key = self._cache_key(
+            "image", file_hash.hexdigest(), str(self.max_dim), str(self.jpeg_quality)
+        )
+        cached = self._cache_get(cache_key)
+        # Einträge älterer Versionen ohne "digest" werden neu kodiert
+        if cached is not None and "digest" in cached:
+            logger.debug(f"Bild aus Cache geladen: {image_path.name}")
+            return cached["data"], cached["mime_type"], cached["digest"]
+
+        encoded, mime_type, digest = self._encode_image_uncached(image_path)
+        self._cache_put(cache_key, {"data": encoded, "mime_type": mime_type, "digest": digest})
+        return encoded, mime_type, digest
+
+    def _encode_image_uncached(self, image_path: Path) -> tuple[str, str, str]:
+        """
+        Kodiert ein Bild als Base64-String.
+
+        Bei max_dim > 0 wird das Bild vorher auf max_dim Pixel (längste Seite)
+        verkleinert und als JPEG neu kodiert. Handyfotos mit 12 MP schrumpfen
+        so auf einen Bruchteil an Upload-Größe und Vision-Tokens.
+
+        Returns:
+            Tuple (base64_string, mime_type, digest); digest ist der SHA-256 der
+            hochgeladenen Bild-Bytes (für die Deduplizierung in process_batch())
+        """
+        if self.max_dim > 0:
+            from PIL import Image, ImageOps
+
+            with Image.open(image_path) as img:
+                # JPEGs direkt verkleinert dekodieren (1/2, 1/4, 1/8) statt alle 12 MP in den Speicher
+                img.draft("RGB", (self.max_dim, self.max_dim))
+                # EXIF-Rotation anwenden, sonst liegen Handyfotos nach dem Re-Encode quer
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((self.max_dim, self.max_dim), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                img.convert("RGB").save(buffer, "JPEG", quality=self.jpeg_quality, optimize=True)
+            size = buffer.tell()
+            # getbuffer() statt getvalue(): kodiert und hasht ohne Kopie der JPEG-Bytes
+            encoded = base64.b64encode(buffer.getbuffer()).decode("ascii")
+            digest = hashlib.sha256(buffer.getbuffer()).hexdigest()
+            mime_type = "image/jpeg"
+        else:
+            mime_type = _MIME_MAP.get(image_path.suffix.lower(), "image/jpeg")
+
+            size = image_path.stat().st_size
+            file_hash = hashlib.sha256()
+            with open(image_path, "rb") as f:
+                encoded = _b64encode_stream(f, size, file_hash)
+            digest = file_hash.hexdigest()
+
+        logger.debug(f"Bild kodiert: {image_path.name} ({mime_type}, {size // 1024} KB)")
+        return encoded, mime_type, digest
+
+    def _get_session(self) -> requests.Session:
+        """
+        Liefert die HTTP-Session des aktuellen Threads.
+
+        Die Session hält die TLS-Verbindung zu OpenRouter offen (Keep-Alive),
+        sodass nicht jeder API-Call einen neuen Handshake braucht. Sessions
+        sind nicht thread-sicher, daher bekommt jeder Worker-Thread eine eigene.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(max_retries=0))
+            session.headers.update({
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://github.com/local/board-digitizer",
+                "X-Title": "Board Digitizer",
+            })
+            self._thread_local.session = session
+        return session
+
+    def _next_backoff(self, prev_delay: float, retry_after: Optional[float] = None) -> float:
+        """
+        Berechnet die nächste Wartezeit vor einem Retry.
 
-        logger.debug(f"Bild kodiert: {image_path.name} ({mime_type})")
-        return encoded, mime_type
+        Nutzt "Decorrelated Jitter": zufällig zwischen RETRY_BASE_DELAY und dem
+        Dreifachen der letzten Wartezeit, gedeckelt auf RETRY_MAX_DELAY. Parallele
+        Worker laufen so nach einem Rate-Limit nicht synchron wieder an. Ein
+        Retry-After-Header des Servers hat Vorrang und wird voll eingehalten;
+        reicht er über das Zeitbudget hinaus, bricht _deadline_reached() ab.
+        """
+        if retry_after is not None:
+            return retry_after
+        return min(self.RETRY_MAX_DELAY, random.uniform(self.RETRY_BASE_DELAY, prev_delay * 3))
 
-    def _build_context_section(self) -> str:
-        """Erstellt den Kontext-Abschnitt für den System-Prompt."""
-        template_text = BOARD_TEMPLATES.get(self.template, "")
+    def _step_budget(self, step: str, input_text: str = "") -> int:
+        """
+        Liefert das max_tokens-Budget für einen Verarbeitungsschritt.
 
-        if self.template == "custom" and self.context:
-            template_text = f"Board-Kontext: {self.context}"
-        elif self.context:
-            template_text = f"{template_text}\n\nZusätzlicher Kontext: {self.context}"
+        Args:
+            step: "analyze", "transcribe", "combined" (Analyse + Transkription),
+                "clean" oder "summary"
+            input_text: Eingabetext, dessen Länge das Budget bestimmt ("clean")
 
-        if template_text:
-            return f"Board-Kontext:\n{template_text}\n"
-        return ""
+        Returns:
+            Token-Budget, höchstens max_tokens (bei "combined" zzgl. Analyse-Budget,
+            soweit MAX_OUTPUT_TOKENS das zulässt)
+        """
+        if step == "transcribe":
+            return self.max_tokens
+        if step == "combined":
+            # Analyse-Budget obendrauf, aber nicht über das Ausgabe-Limit des Modells
+            combined = self.max_tokens + self.MAX_TOKENS_PER_STEP["analyze"]
+            return max(min(combined, self.MAX_OUTPUT_TOKENS), self.max_tokens)
+        budget = self.MAX_TOKENS_PER_STEP[step]
+        if step == "clean":
+            # Bereinigter Text ist etwa so lang wie die Rohdaten (+10% Reserve)
+            budget = max(budget, int(_estimate_tokens(input_text) * 1.1))
+        return min(budget, self.max_tokens)
+
+    def _register_backoff(self, delay: float) -> None:
+        """Setzt ein globales Backoff, das alle Worker-Threads respektieren."""
+        with self._backoff_lock:
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+
+    def _wait_for_backoff(self) -> None:
+        """Wartet, bis ein aktives globales Backoff (z.B. nach HTTP 429) abgelaufen ist."""
+        with self._backoff_lock:
+            remaining = self._backoff_until - time.monotonic()
+        if remaining > 0:
+            logger.info(f"Globales Backoff aktiv. Warte {remaining:.1f}s...")
+            self._cancelled.wait(remaining)
+
+    def _check_cancelled(self) -> None:
+        """Wirft CancelledError, sobald die Verarbeitung abgebrochen wurde."""
+        if self._cancelled.is_set():
+            raise CancelledError("Verarbeitung abgebrochen.")
 
     def _call_api(
         self,
         messages: list[dict],
         model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        validate: Optional[Callable[[str], Any]] = None,
+        fallback: bool = True,
     ) -> str:
         """
-        Führt einen API-Call durch mit Retry-Logik und Fallback.
+        Führt einen API-Call durch; identische Anfragen werden aus dem Disk-Cache bedient.
+
+        Der Cache-Key umfasst Modell, max_tokens und alle Nachrichten (inkl.
+        Bild, Template, Kontext und Konfidenz-Einstellung). Ändert sich nur ein
+        Prompt, wird nur dieser Schritt neu angefragt.
 
         Args:
             messages: Liste der Chat-Nachrichten
             model: Modell-ID (überschreibt self.model)
+            max_tokens: Token-Budget der Antwort (überschreibt self.max_tokens)
+            validate: Prüft die Antwort vor dem Cachen (z.B. _parse_vision_json);
+                wirft sie ValueError, wird die Antwort nicht gecacht und der
+                Fehler weitergereicht
+            fallback: Bei Fehlschlag auf FALLBACK_MODEL ausweichen
 
         Returns:
             Antwort-Text des Modells
 
         Raises:
             RuntimeError: Wenn alle Versuche fehlschlagen
+            ValueError: Wenn validate die Antwort ablehnt
         """
-        used_model = model or self.model
-        last_exception: Optional[Exception] = None
-
-        for attempt in range(1, self.MAX_RETRIES + 1):
+        max_tokens = max_tokens or self.max_tokens
+        if not self.cache:
+            content = self._request_completion(messages, model, max_tokens, fallback)
+            if validate is not None:
+                validate(content)
+            return content
+
+        cache_key = self._cache_key(
+            "api",
+            model or self.model,
+            str(max_tokens),
+            orjson.dumps(messages, option=orjson.OPT_SORT_KEYS),
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
             try:
-                logger.info(f"API-Call (Versuch {attempt}/{self.MAX_RETRIES}) mit Modell: {used_model}")
-
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://github.com/local/board-digitizer",
-                    "X-Title": "Board Digitizer",
-                }
-
-                payload = {
-                    "model": used_model,
-                    "messages": messages,
-                    "max_tokens": self.max_tokens,
-                }
-
-                response = requests.post(
-                    self.API_URL,
-                    headers=headers,
-                    json=payload,
-                    timeout=120,
-                )
-                response.raise_for_status()
+                if validate is not None:
+                    validate(cached["content"])
+            except ValueError:
+                # Unbrauchbarer Eintrag (z.B. aus älterer Version): neu anfragen
+                logger.info("Gecachte API-Antwort unbrauchbar, frage neu an.")
+            else:
+                logger.info("API-Antwort aus Cache geladen.")
+                return cached["content"]
+
+        content = self._request_completion(messages, model, max_tokens, fallback)
+        if validate is not None:
+            validate(content)
+        self._cache_put(cache_key, {"content": content})
+        return content
+
+    def _request_completion(
+        self,
+        messages: list[dict],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        fallback: bool = True,
+    ) -> str:
+        """
+        Führt einen API-Call durch mit Retry-Logik und Fallback.
+
+        Erst wird das primäre Modell mit bis zu MAX_RETRIES Versuchen angefragt,
+        danach einmalig das Fallback-Modell. Alle Versuche zusammen starten
+        höchstens TOTAL_DEADLINE Sekunden nach Beginn des Calls.
+
+        Args:
+            messages: Liste der Chat-Nachrichten
+            model: Modell-ID (überschreibt self.model)
+            max_tokens: Token-Budget der Antwort (überschreibt self.max_tokens)
+            fallback: Bei Fehlschlag auf das Fallback-Modell ausweichen
 
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-                logger.info(f"API-Call erfolgreich. Tokens verwendet: {data.get('usage', {})}")
+        Returns:
+            Antwort-Text des Modells
+
+        Raises:
+            UnrecoverableError: Bei Fehlern, die kein Retry beheben kann (401, 402, kein Vision)
+            RuntimeError: Wenn alle Versuche fehlschlagen
+        """
+        primary_model = model or self.model
+        max_tokens = max_tokens or self.max_tokens
+        models = [primary_model]
+        if fallback and self.fallback_model != primary_model:
+            models.append(self.fallback_model)
+
+        deadline = time.monotonic() + self.TOTAL_DEADLINE
+        errors: list[tuple[str, Exception]] = []
+
+        for used_model in models:
+            if errors:
+                if self._cancelled.is_set():
+                    raise CancelledError("Verarbeitung abgebrochen.") from errors[0][1]
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"Zeitbudget von {self.TOTAL_DEADLINE:.0f}s erschöpft, "
+                        f"kein Versuch mit Fallback-Modell '{used_model}'."
+                    )
+                    break
+                logger.warning(
+                    f"API-Calls mit '{primary_model}' fehlgeschlagen. "
+                    f"Wechsle zu Fallback-Modell: {used_model}"
+                )
+            try:
+                content = self._try_model(messages, used_model, max_tokens, deadline, errors)
+            except UnrecoverableError as e:
+                if not errors:
+                    raise
+                # Fehler des primären Modells nicht verschlucken
+                raise UnrecoverableError(
+                    f"{e} (zuvor mit '{errors[0][0]}': {errors[0][1]})"
+                ) from errors[0][1]
+            if content is not None:
                 return content
 
-            except requests.exceptions.Timeout as e:
-                last_exception = e
-                logger.warning(f"Timeout bei Versuch {attempt}. Warte {self.RETRY_BASE_DELAY ** attempt}s...")
-                if attempt < self.MAX_RETRIES:
-                    time.sleep(self.RETRY_BASE_DELAY ** attempt)
-
-            except requests.exceptions.HTTPError as e:
-                last_exception = e
-                status_code = e.response.status_code if e.response else "?"
-                error_body = e.response.text if e.response else ""
-
-                if status_code == 401:
-                    raise RuntimeError(
-                        "API-Key ungültig oder nicht gesetzt. "
-                        "Prüfe OPENROUTER_API_KEY in der .env Datei."
-                    ) from e
-                elif status_code == 402:
-                    raise RuntimeError(
-                        "Unzureichendes Guthaben im OpenRouter-Account. "
-                        "Bitte Konto aufladen unter https://openrouter.ai/credits"
-                    ) from e
-                elif status_code == 400 and "vision" in error_body.lower():
-                    raise RuntimeError(
-                        f"Modell '{used_model}' unterstützt kein Vision/Bild-Input. "
-                        "Wechsle zu google/gemini-2.0-flash oder anthropic/claude-sonnet-4-5"
+        summary = "; ".join(f"{name}: {error}" for name, error in errors)
+        raise RuntimeError(
+            f"Alle API-Versuche fehlgeschlagen. {summary}"
+        ) from errors[0][1]
+
+    def _try_model(
+        self,
+        messages: list[dict],
+        model: str,
+        max_tokens: int,
+        deadline: float,
+        errors: list[tuple[str, Exception]],
+    ) -> Optional[str]:
+        """
+        Fragt ein einzelnes Modell mit Retries an.
+
+        Returns:
+            Antwort-Text, oder None wenn alle Versuche scheitern; der letzte
+            Fehler wird dann als (model, exception) an errors angehängt
+
+        Raises:
+            UnrecoverableError: Bei HTTP 401, 402 oder fehlender Vision-Unterstützung
+        """
+        import requests
+
+        try:
+            return self._request_with_retries(messages, model, max_tokens, deadline)
+        except requests.exceptions.RequestException as e:
+            errors.append((model, e))
+            return None
+
+    def _request_with_retries(
+        self, messages: list[dict], model: str, max_tokens: int, deadline: float
+    ) -> str:
+        """
+        Fragt ein Modell mit bis zu MAX_RETRIES Versuchen an.
+
+        Wiederholt werden nur vorübergehende Fehler (Timeout, Verbindungsabbruch,
+        HTTP 429/5xx); siehe _is_retryable(). Nach Ablauf von deadline
+        (time.monotonic()) startet kein weiterer Versuch.
+
+        Raises:
+            requests.exceptions.RequestException: Wenn alle Versuche scheitern oder
+                der Fehler nicht wiederholbar ist
+        """
+        from tenacity import Retrying, retry_if_exception, stop_after_attempt, stop_any
+
+        retrying = Retrying(
+            stop=stop_any(
+                stop_after_attempt(self.MAX_RETRIES),
+                functools.partial(self._deadline_reached, deadline=deadline),
+                lambda retry_state: self._cancelled.is_set(),
+            ),
+            wait=functools.partial(self._retry_wait, deadline=deadline),
+            retry=retry_if_exception(_is_retryable),
+            before=self._before_attempt,
+            before_sleep=self._before_retry,
+            sleep=self._cancelled.wait,  # Wartezeit endet sofort bei Abbruch
+            reraise=True,
+        )
+        return retrying(self._post_completion, messages, model, max_tokens=max_tokens)
+
+    def _post_completion(self, messages: list[dict], model: str, max_tokens: int) -> str:
+        """
+        Schickt einen einzelnen Chat-Completion-Request ab und sammelt die gestreamte Antwort.
+
+        Raises:
+            UnrecoverableError: Bei HTTP 401, 402 oder fehlender Vision-Unterstützung
+            requests.exceptions.RequestException: Bei allen übrigen HTTP-/Netzwerkfehlern
+        """
+        return "".join(self._stream_completion(messages, model, max_tokens))
+
+    def _stream_completion(self, messages: list[dict], model: str, max_tokens: int) -> Iterator[str]:
+        """
+        Schickt einen Chat-Completion-Request mit "stream": true ab.
+
+        Die Antwort kommt als Server-Sent Events; die Text-Deltas werden
+        geliefert, sobald sie eintreffen. Der Timeout gilt damit pro
+        Lesevorgang statt für die gesamte Generierung, lange Transkriptionen
+        laufen also nicht mehr in den 120s-Timeout.
+
+        Yields:
+            Text-Fragmente der Modell-Antwort
+
+        Raises:
+            UnrecoverableError: Bei HTTP 401, 402 oder fehlender Vision-Unterstützung
+            requests.exceptions.RequestException: Bei allen übrigen HTTP-/Netzwerkfehlern
+        """
+        import requests
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+
+        # orjson serialisiert den MB-großen Base64-Payload deutlich schneller als json.dumps
+        body = orjson.dumps(payload)
+
+        with self._api_slots:
+            response = self._get_session().post(
+                self.API_URL,
+                data=body,
+                timeout=120,
+                stream=True,
+            )
+            with response:
+                self._raise_for_status(response, model)
+
+                usage: dict = {}
+                try:
+                    if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                        # Antwort ohne Streaming (z.B. Proxy/Provider ignoriert "stream"): normales JSON
+                        data = orjson.loads(response.content)
+                        if isinstance(data, dict) and "error" in data:
+                            raise requests.exceptions.RequestException(
+                                f"Fehler in der API-Antwort: {data['error']}", response=response
+                            )
+                        try:
+                            content = data["choices"][0]["message"]["content"]
+                        except (KeyError, IndexError, TypeError):
+                            content = None
+                        if not isinstance(content, str):
+                            raise requests.exceptions.InvalidJSONError(
+                                f"API-Antwort von {model} ohne Text-Inhalt", response=response
+                            )
+                        usage = data.get("usage", {})
+                        yield content
+                    else:
+                        for event in _iter_sse_events(response):
+                            # Bei Abbruch nicht bis zum Ende der Generierung mitlesen
+                            self._check_cancelled()
+                            if "error" in event:
+                                raise requests.exceptions.RequestException(
+                                    f"Fehler im Antwort-Stream: {event['error']}"
+                                )
+                            usage = event.get("usage") or usage
+                            for choice in event.get("choices") or []:
+                                delta = (choice.get("delta") or {}).get("content")
+                                if delta:
+                                    yield delta
+                except orjson.JSONDecodeError as e:
+                    # Als RequestException weiterreichen: Retry/Fallback greifen, und
+                    # _vision_stage() hält es nicht für unlesbares Vision-JSON (ValueError)
+                    raise requests.exceptions.InvalidJSONError(
+                        f"Ungültige JSON-Antwort von {model}: {e}", response=response
                     ) from e
-                elif status_code in (429, 503):
-                    logger.warning(f"Rate-Limit/Service unavailable (HTTP {status_code}). Warte...")
-                    if attempt < self.MAX_RETRIES:
-                        time.sleep(self.RETRY_BASE_DELAY ** attempt)
-                else:
-                    logger.error(f"HTTP-Fehler {status_code}: {error_body[:500]}")
-                    if attempt < self.MAX_RETRIES:
-                        time.sleep(self.RETRY_BASE_DELAY)
-
-            except requests.exceptions.RequestException as e:
-                last_exception = e
-                logger.warning(f"Verbindungsfehler bei Versuch {attempt}: {e}")
-                if attempt < self.MAX_RETRIES:
-                    time.sleep(self.RETRY_BASE_DELAY ** attempt)
-
-        # Fallback auf alternatives Modell
-        if used_model != self.fallback_model:
+
+        logger.info(f"API-Call erfolgreich. Tokens verwendet: {usage}")
+
+    @staticmethod
+    def _raise_for_status(response: requests.Response, model: str) -> None:
+        """
+        Prüft den HTTP-Status und übersetzt nicht behebbare Fehler.
+
+        Raises:
+            UnrecoverableError: Bei HTTP 401, 402 oder fehlender Vision-Unterstützung
+                (VisionUnsupportedError)
+            requests.exceptions.HTTPError: Bei allen übrigen HTTP-Fehlern
+        """
+        import requests
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            status_code = response.status_code
+            error_body = response.text
+
+            if status_code == 401:
+                raise UnrecoverableError(
+                    "API-Key ungültig oder nicht gesetzt. "
+                    "Prüfe OPENROUTER_API_KEY in der .env Datei."
+                ) from e
+            elif status_code == 402:
+                raise UnrecoverableError(
+                    "Unzureichendes Guthaben im OpenRouter-Account. "
+                    "Bitte Konto aufladen unter https://openrouter.ai/credits"
+                ) from e
+            elif status_code == 400 and "vision" in error_body.lower():
+                raise VisionUnsupportedError(
+                    f"Modell '{model}' unterstützt kein Vision/Bild-Input. "
+                    "Wechsle zu google/gemini-2.0-flash oder anthropic/claude-sonnet-4-5"
+                ) from e
+
+            if status_code == 429 or status_code >= 500:
+                # Vorübergehend: _before_retry() protokolliert den Retry als Warnung
+                logger.debug(f"HTTP-Fehler {status_code}: {error_body[:500]}")
+            else:
+                logger.error(f"HTTP-Fehler {status_code}: {error_body[:500]}")
+            raise
+
+    def _before_attempt(self, retry_state: RetryCallState) -> None:
+        """Wartet ein globales Backoff ab und protokolliert den Versuch (nicht nach Abbruch)."""
+        self._wait_for_backoff()
+        self._check_cancelled()
+        _, model = retry_state.args
+        logger.info(
+            f"API-Call (Versuch {retry_state.attempt_number}/{self.MAX_RETRIES}) mit Modell: {model}"
+        )
+
+    @staticmethod
+    def _retry_after(retry_state: RetryCallState) -> Optional[float]:
+        """Liefert den Retry-After-Header (Sekunden) des letzten Fehlers, falls vorhanden."""
+        import requests
+
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            return _parse_retry_after(exc.response.headers.get("Retry-After"))
+        return None
+
+    def _deadline_reached(self, retry_state: RetryCallState, deadline: float) -> bool:
+        """
+        tenacity-Stoppbedingung: Zeitbudget abgelaufen oder Retry-After reicht darüber hinaus.
+
+        Ein Retry, den der Server erst nach Ablauf von deadline zulässt, ist
+        zwecklos; dann lieber gleich zum Fallback-Modell bzw. zum Fehler.
+        Gleiches gilt, wenn nicht einmal RETRY_BASE_DELAY Wartezeit übrig ist.
+        """
+        remaining = deadline - time.monotonic()
+        retry_after = self._retry_after(retry_state)
+        if retry_after is not None and retry_after >= remaining:
             logger.warning(
-                f"Alle {self.MAX_RETRIES} Versuche mit '{used_model}' fehlgeschlagen. "
-                f"Wechsle zu Fallback-Modell: {self.fallback_model}"
+                f"Retry-After von {retry_after:.0f}s überschreitet das Zeitbudget "
+                f"({max(remaining, 0):.0f}s übrig). Kein weiterer Versuch."
             )
-            return self._call_api(messages, model=self.fallback_model)
+            return True
+        return remaining < self.RETRY_BASE_DELAY
 
-        raise RuntimeError(
-            f"Alle {self.MAX_RETRIES} API-Versuche fehlgeschlagen. "
-            f"Letzter Fehler: {last_exception}"
-        )
+    def _retry_wait(self, retry_state: RetryCallState, deadline: float) -> float:
+        """
+        tenacity-Wartestrategie: Retry-After-Header, sonst Decorrelated Jitter.
+
+        Die Wartezeit endet spätestens mit deadline, damit kein Versuch nach
+        Ablauf des Zeitbudgets startet.
+        """
+        prev_delay = retry_state.upcoming_sleep or self.RETRY_BASE_DELAY
+        delay = self._next_backoff(prev_delay, self._retry_after(retry_state))
+        return max(0.0, min(delay, deadline - time.monotonic()))
+
+    def _before_retry(self, retry_state: RetryCallState) -> None:
+        """Protokolliert den Fehler vor einem Retry; Rate-Limits bremsen alle Worker."""
+        import requests
+
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_state.upcoming_sleep
+        attempt = retry_state.attempt_number
+
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            status_code = exc.response.status_code
+            if status_code in (429, 503):
+                logger.warning(
+                    f"Rate-Limit/Service unavailable (HTTP {status_code}). Warte {delay:.1f}s..."
+                )
+                # Backoff gilt für alle Worker, nicht nur für diesen Thread
+                self._register_backoff(delay)
+            else:
+                logger.warning(f"HTTP {status_code} bei Versuch {attempt}. Warte {delay:.1f}s...")
+        elif isinstance(exc, requests.exceptions.Timeout):
+            logger.warning(f"Timeout bei Versuch {attempt}. Warte {delay:.1f}s...")
+        elif isinstance(exc, requests.exceptions.InvalidJSONError):
+            logger.warning(f"{exc} (Versuch {attempt}). Warte {delay:.1f}s...")
+        else:
+            logger.warning(f"Verbindungsfehler bei Versuch {attempt}: {exc}. Warte {delay:.1f}s...")
+
+    @staticmethod
+    def _build_system_message(text: str) -> dict:
+        """Erstellt eine System-Nachricht, die der Provider cachen darf (Prompt-Caching)."""
+        return {
+            "role": "system",
+            "content": [
+                {
+                    "type": "text",
+                    "text": text,
+                    "cache_control": {"type": "ephemeral"},
+                },
+            ],
+        }
 
-    def _build_vision_message(self, image_b64: str, mime_type: str, prompt: str) -> list[dict]:
-        """Erstellt eine Vision-API-Nachricht mit Bild und Text."""
+    def _build_text_messages(self, structure_analysis: str, prompt: str) -> list[dict]:
+        """
+        Erstellt die Nachrichten für einen Text-Schritt (3 oder 4).
+
+        Präfix, Board-Kontext und Strukturanalyse sind für beide Text-Schritte
+        eines Boards identisch und stehen daher im cachebaren System-Teil.
+        """
+        system_text = (
+            f"{CACHED_SYSTEM_PREFIX}\n\n"
+            f"{self._context_section}\n"
+            f"Strukturanalyse:\n{structure_analysis}"
+        )
         return [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{mime_type};base64,{image_b64}"
-                        },
-                    },
-                    {
-                        "type": "text",
-                        "text": prompt,
-                    },
-                ],
-            }
+            self._build_system_message(system_text),
+            {"role": "user", "content": prompt},
         ]
 
+    @staticmethod
+    def _parse_vision_json(text: str) -> tuple[str, str]:
+        """
+        Liest die kombinierte Vision-Antwort {"structure": ..., "transcription": ...}.
+
+        Toleriert Markdown-Codeblöcke oder Begleittext um das JSON-Objekt sowie
+        unmaskierte Zeilenumbrüche in den Strings (Modelle schreiben die
+        Markdown-Transkription oft wörtlich ins JSON).
+
+        Raises:
+            ValueError: Wenn kein gültiges JSON-Objekt mit beiden Feldern enthalten ist
+        """
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            raise ValueError("Kein JSON-Objekt in der Antwort gefunden.")
+        data = json.loads(text[start:end + 1], strict=False)
+        if not isinstance(data, dict):
+            raise ValueError("Antwort ist kein JSON-Objekt.")
+        structure, transcription = data.get("structure"), data.get("transcription")
+        if not isinstance(structure, str) or not isinstance(transcription, str):
+            raise ValueError("Felder 'structure'/'transcription' fehlen in der Antwort.")
+        return structure, transcription
+
+    def _build_vision_message(self, images: list[tuple[str, str]], prompt: str) -> list[dict]:
+        """
+        Erstellt eine Vision-API-Nachricht mit Bild(ern) und Text.
+
+        Bei mehreren Bildern steht vor jedem Bild ein "Bild n:"-Label, damit
+        das Modell die Antworten eindeutig zuordnen kann.
+
+        Args:
+            images: Liste von (base64_string, mime_type)
+            prompt: Anweisung nach den Bildern
+        """
+        content: list[dict] = []
+        for index, (image_b64, mime_type) in enumerate(images, start=1):
+            image_url = {"url": f"data:{mime_type};base64,{image_b64}"}
+            if self.detail:
+                image_url["detail"] = self.detail
+
+            if len(images) > 1:
+                content.append({"type": "text", "text": f"Bild {index}:"})
+            content.append({"type": "image_url", "image_url": image_url})
+
+        content.append({"type": "text", "text": prompt})
+        return [{"role": "user", "content": content}]
+
+    @staticmethod
+    def _parse_group_response(text: str, count: int) -> list[tuple[str, str]]:
+        """
+        Zerlegt die Antwort eines Sammel-Calls an den ---BOARD-n----Trennern.
+
+        Returns:
+            Liste (structure_analysis, raw_content) in Bild-Reihenfolge
+
+        Raises:
+            ValueError: Wenn nicht genau die Boards 1..count enthalten sind
+                oder ein Abschnitt kein gültiges JSON ist
+        """
+        parts = GROUP_DELIMITER_PATTERN.split(text)
+        sections = {int(number): body for number, body in zip(parts[1::2], parts[2::2])}
+        if sorted(sections) != list(range(1, count + 1)):
+            raise ValueError(
+                f"Erwartet Boards 1-{count}, erhalten: {sorted(sections) or 'keine Trenner'}"
+            )
+        return [BoardDigitizer._parse_vision_json(sections[index]) for index in range(1, count + 1)]
+
     # ------------------------------------------------------------------
     # Öffentliche Verarbeitungs-Methoden
     # ------------------------------------------------------------------
 
+    def analyze_and_transcribe(self, image_b64: str, mime_type: str) -> tuple[str, str]:
+        """
+        Schritt 1+2: Strukturanalyse und Transkription in einem einzigen Vision-Call.
+
+        Das Bild wird nur einmal hochgeladen und analysiert; das Modell liefert
+        beide Ergebnisse als JSON-Objekt.
+
+        Args:
+            image_b64: Base64-kodiertes Bild
+            mime_type: MIME-Typ des Bildes
+
+        Returns:
+            Tuple (structure_analysis, raw_content)
+
+        Raises:
+            ValueError: Wenn die Antwort nicht als JSON gelesen werden kann
+        """
+        logger.info("Starte Strukturanalyse + Transkription (kombiniert)...")
+
+        messages = [
+            self._build_system_message(self._system_prompt),
+            *self._build_vision_message([(image_b64, mime_type)], COMBINED_VISION_PROMPT),
+        ]
+
+        response = self._call_api(
+            messages, max_tokens=self._step_budget("combined"), validate=self._parse_vision_json
+        )
+        result = self._parse_vision_json(response)
+        logger.info("Strukturanalyse + Transkription abgeschlossen.")
+        return result
+
+    def analyze_and_transcribe_group(self, images: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        Schritt 1+2 für mehrere Boards in einem einzigen Vision-Call.
+
+        System-Prompt und Verbindungsaufbau fallen nur einmal für die ganze
+        Gruppe an. Nur für Modelle, die mehrere Bilder pro Nachricht annehmen.
+        Ohne Ausweichen auf das Fallback-Modell: scheitert der Sammel-Call,
+        ist der Einzel-Call mit dem primären Modell die günstigere Alternative.
+        Das Token-Budget ist auf MAX_OUTPUT_TOKENS begrenzt.
+
+        Args:
+            images: Liste von (base64_string, mime_type)
+
+        Returns:
+            Liste (structure_analysis, raw_content) in Bild-Reihenfolge
+
+        Raises:
+            ValueError: Wenn die Antwort nicht in die einzelnen Boards zerlegt werden kann
+            VisionUnsupportedError: Wenn der Provider mehrere Bilder ablehnt (HTTP 400)
+        """
+        logger.info(f"Starte Strukturanalyse + Transkription für {len(images)} Boards (Sammel-Call)...")
+
+        messages = [
+            self._build_system_message(self._system_prompt),
+            *self._build_vision_message(images, GROUP_VISION_PROMPT.format(count=len(images))),
+        ]
+
+        response = self._call_api(
+            messages,
+            max_tokens=min(self._step_budget("combined") * len(images), self.MAX_OUTPUT_TOKENS),
+            validate=lambda text: self._parse_group_response(text, len(images)),
+            fallback=False,
+        )
+        results = self._parse_group_response(response, len(images))
+        logger.info(f"Sammel-Call für {len(images)} Boards abgeschlossen.")
+        return results
+
     def analyze_structure(self, image_b64: str, mime_type: str) -> str:
         """
         Schritt 1: Analysiert die Struktur des Boards (Layout, Farben, Votes).
@@ -319,14 +1132,6 @@ class BoardDigitizer:
         """
         logger.info("Starte Strukturanalyse...")
 
-        context_section = self._build_context_section()
-        confidence_section = CONFIDENCE_SECTION if self.confidence else ""
-
-        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
-            context_section=context_section,
-            confidence_section=confidence_section,
-        )
-
         prompt = (
             "Führe NUR Schritt 1 (STRUKTURANALYSE) durch. "
             "Beschreibe Layout-Typ, Farb-Semantik, Voting-Punkte und Verbindungen. "
@@ -334,38 +1139,42 @@ class BoardDigitizer:
         )
 
         messages = [
-            {"role": "system", "content": system_prompt},
-            *self._build_vision_message(image_b64, mime_type, prompt),
+            self._build_system_message(self._system_prompt),
+            *self._build_vision_message([(image_b64, mime_type)], prompt),
         ]
 
-        result = self._call_api(messages)
+        result = self._call_api(messages, max_tokens=self._step_budget("analyze"))
         logger.info("Strukturanalyse abgeschlossen.")
         return result
 
-    def transcribe_raw(self, image_b64: str, mime_type: str, structure_analysis: str) -> str:
+    def transcribe_raw(
+        self,
+        image_b64: str,
+        mime_type: str,
+        structure_analysis: Optional[str] = None,
+    ) -> str:
         """
         Schritt 2: Erstellt die Rohdaten-Transkription (_Raw.md).
 
         Args:
             image_b64: Base64-kodiertes Bild
             mime_type: MIME-Typ des Bildes
-            structure_analysis: Ergebnis aus analyze_structure()
+            structure_analysis: Ergebnis aus analyze_structure(); ohne Analyse
+                leitet das Modell die Gliederung selbst aus dem Bild ab, und
+                der Call kann parallel zur Strukturanalyse laufen
 
         Returns:
             Rohdaten-Markdown als Text
         """
         logger.info("Starte Rohdaten-Transkription...")
 
-        context_section = self._build_context_section()
-        confidence_section = CONFIDENCE_SECTION if self.confidence else ""
-
-        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
-            context_section=context_section,
-            confidence_section=confidence_section,
+        analysis_section = (
+            f"Die Strukturanalyse hat folgendes ergeben:\n\n{structure_analysis}\n\n"
+            if structure_analysis
+            else ""
         )
-
         prompt = (
-            f"Die Strukturanalyse hat folgendes ergeben:\n\n{structure_analysis}\n\n"
+            f"{analysis_section}"
             "Führe nun Schritt 2 (TRANSKRIPTION) durch. "
             "Transkribiere ALLE Zettel/Karten 1:1, inklusive Tippfehler und Abkürzungen. "
             "Nutze die erkannte Struktur als Gliederung (## für Spalten/Cluster, * für Zettel). "
@@ -373,11 +1182,11 @@ class BoardDigitizer:
         )
 
         messages = [
-            {"role": "system", "content": system_prompt},
-            *self._build_vision_message(image_b64, mime_type, prompt),
+            self._build_system_message(self._system_prompt),
+            *self._build_vision_message([(image_b64, mime_type)], prompt),
         ]
 
-        result = self._call_api(messages)
+        result = self._call_api(messages, max_tokens=self._step_budget("transcribe"))
         logger.info("Rohdaten-Transkription abgeschlossen.")
         return result
 
@@ -394,46 +1203,52 @@ class BoardDigitizer:
         """
         logger.info("Starte Bereinigung & Anreicherung...")
 
-        context_section = self._build_context_section()
-
         prompt = (
-            f"{context_section}\n"
             "Du erhältst eine Rohdaten-Transkription eines Workshop-Boards. "
             "Führe folgende Bereinigungen durch:\n\n"
-            "1. Löse Abkürzungen auf (NUR wenn Kontext eindeutig, sonst belassen)\n"
-            "2. Sortiere Einträge absteigend nach Votes/Stimmen (falls vorhanden)\n"
-            "3. Entferne Farb-Annotationen wenn inhaltlich irrelevant (Noise Reduction)\n"
-            "4. Reduziere Klebepunkte auf Zahlenwerte: '(3 rote Punkte, 1 grün)' → '(4 Stimmen)'\n"
-            "5. Behalte die Markdown-Struktur (##, *) bei\n\n"
-            f"Strukturkontext:\n{structure_analysis}\n\n"
+            f"{CLEANUP_RULES}\n"
             f"Rohdaten:\n\n{raw_content}"
         )
 
-        messages = [{"role": "user", "content": prompt}]
-        result = self._call_api(messages)
+        messages = self._build_text_messages(structure_analysis, prompt)
+        result = self._call_api(messages, max_tokens=self._step_budget("clean", raw_content))
         logger.info("Bereinigung & Anreicherung abgeschlossen.")
         return result
 
-    def synthesize_summary(self, cleaned_content: str, structure_analysis: str) -> str:
+    def synthesize_summary(
+        self,
+        cleaned_content: str,
+        structure_analysis: str,
+        apply_cleanup: bool = False,
+    ) -> str:
         """
         Schritt 4: Erstellt die Executive Summary (_Summary.md).
 
         Args:
-            cleaned_content: Bereinigter Inhalt aus clean_and_enrich()
+            cleaned_content: Bereinigter Inhalt aus clean_and_enrich(), bei
+                apply_cleanup=True die unbereinigte Rohdaten-Transkription
             structure_analysis: Strukturanalyse für Kontext
+            apply_cleanup: Bereinigung (Schritt 3) im selben Call erledigen,
+                spart den separaten clean_and_enrich()-Call
 
         Returns:
             Summary-Markdown als Text
         """
         logger.info("Starte Synthese / Executive Summary...")
 
-        context_section = self._build_context_section()
-        template_hint = BOARD_TEMPLATES.get(self.template, "")
+        if apply_cleanup:
+            data_section = (
+                "Die Board-Daten sind eine unbereinigte Rohdaten-Transkription. "
+                "Wende vor der Zusammenfassung folgende Bereinigungen an:\n\n"
+                f"{CLEANUP_RULES}\n"
+                f"Rohdaten:\n\n{cleaned_content}"
+            )
+        else:
+            data_section = f"Bereinigte Daten:\n\n{cleaned_content}"
 
         prompt = (
-            f"{context_section}\n"
             f"Board-Template: {self.template}\n"
-            f"{f'Template-Kontext: {template_hint}' if template_hint else ''}\n\n"
+            f"{self._template_hint}\n\n"
             "Erstelle eine strukturierte _Summary.md aus den bereinigten Board-Daten.\n\n"
             "## Pflicht-Struktur der Summary:\n\n"
             "### Executive Summary (max. 10 Zeilen)\n"
@@ -445,24 +1260,56 @@ class BoardDigitizer:
             "- Strukturiert nach Themenbereichen aus der Analyse\n"
             "- Pfeile/Verbindungen verbalisieren: 'Thema A führt zu Thema B'\n"
             "- Absteigende Sortierung nach Relevanz/Votes\n\n"
-            f"Strukturanalyse:\n{structure_analysis}\n\n"
-            f"Bereinigte Daten:\n\n{cleaned_content}"
+            f"{data_section}"
         )
 
-        messages = [{"role": "user", "content": prompt}]
-        result = self._call_api(messages)
+        messages = self._build_text_messages(structure_analysis, prompt)
+        result = self._call_api(messages, max_tokens=self._step_budget("summary"))
         logger.info("Synthese abgeschlossen.")
         return result
 
-    def process_board(self, image_path: Path) -> tuple[Path, Path]:
+    # ------------------------------------------------------------------
+    # Pipeline-Stufen
+    # ------------------------------------------------------------------
+
+    def _output_paths(self, image_path: Path) -> tuple[Path, Path]:
+        """Liefert die Ausgabe-Pfade (raw_md_path, summary_md_path) für ein Board."""
+        board_name = image_path.stem
+        return (
+            self.output_dir / f"{board_name}_Raw.md",
+            self.output_dir / f"{board_name}_Summary.md",
+        )
+
+    def _copy_outputs(self, source: Path, duplicate: Path) -> tuple[Path, Path]:
         """
-        Orchestriert alle 4 Verarbeitungsschritte für ein Board-Foto.
+        Übernimmt die Ausgabe-Dateien eines inhaltsgleichen Boards für ein Duplikat.
 
-        Args:
-            image_path: Pfad zum Bild-File
+        Die Dateien werden kopiert, nur der Board-Name in der Überschrift wird
+        angepasst. Es fällt kein API-Call an.
 
         Returns:
-            Tuple (raw_md_path, summary_md_path)
+            Tuple (raw_md_path, summary_md_path) des Duplikats
+        """
+        if duplicate.stem != source.stem:
+            suffixes = ["_Raw.md", "_Summary.md"]
+            if self.save_intermediate:
+                suffixes.append("_Clean.md")
+            for suffix in suffixes:
+                text = (self.output_dir / f"{source.stem}{suffix}").read_text(encoding="utf-8")
+                title, newline, body = text.partition("\n")
+                if title.endswith(f": {source.stem}"):
+                    title = title[: -len(source.stem)] + duplicate.stem
+                _write_atomic(self.output_dir / f"{duplicate.stem}{suffix}", title + newline + body)
+
+        logger.info(f"{duplicate.name} ist identisch mit {source.name} – dedupliziert.")
+        return self._output_paths(duplicate)
+
+    def _encode_stage(self, image_path: Path) -> tuple[str, str, str]:
+        """
+        Stufe 1: Prüft und kodiert ein Board-Foto.
+
+        Returns:
+            Tuple (base64_string, mime_type, digest)
 
         Raises:
             ValueError: Bei nicht unterstütztem Dateiformat
@@ -477,25 +1324,69 @@ class BoardDigitizer:
                 f"Erlaubt: {', '.join(self.SUPPORTED_FORMATS)}"
             )
 
-        board_name = image_path.stem
-        raw_path = self.output_dir / f"{board_name}_Raw.md"
-        summary_path = self.output_dir / f"{board_name}_Summary.md"
-
         logger.info(f"{'='*60}")
         logger.info(f"Verarbeite Board: {image_path.name}")
         logger.info(f"Template: {self.template} | Modell: {self.model}")
         logger.info(f"{'='*60}")
 
-        # Bild kodieren
-        image_b64, mime_type = self._encode_image(image_path)
+        return self._encode_image(image_path)
+
+    def _vision_stage(
+        self,
+        image_path: Path,
+        image_b64: str,
+        mime_type: str,
+    ) -> tuple[str, str, Future]:
+        """
+        Stufe 2: Strukturanalyse + Rohdaten-Transkription.
+
+        _Raw.md wird im Hintergrund geschrieben, während die nächste Stufe
+        bereits läuft.
+
+        Returns:
+            Tuple (structure_analysis, raw_content, raw_written), wobei
+            raw_written das Future des Schreibvorgangs ist
+        """
+        # Schritt 1+2: Strukturanalyse + Rohdaten-Transkription in einem Call
+        try:
+            structure_analysis, raw_content = self.analyze_and_transcribe(image_b64, mime_type)
+        except ValueError as e:
+            logger.warning(f"Kombinierte Antwort nicht lesbar ({e}). Nutze getrennte Vision-Calls.")
+            # Beide Calls brauchen nur das Bild → gleichzeitig statt nacheinander
+            structure_future = self._vision_split.submit(self.analyze_structure, image_b64, mime_type)
+            raw_content = self.transcribe_raw(image_b64, mime_type)
+            structure_analysis = structure_future.result()
+
+        raw_written = self._writer.submit(self._write_raw, image_path, structure_analysis, raw_content)
+        return structure_analysis, raw_content, raw_written
+
+    def _vision_group_stage(
+        self,
+        jobs: list[tuple[Path, str, str]],
+    ) -> list[tuple[str, str, Future]]:
+        """
+        Stufe 2 für eine Gruppe von Boards (--group-size > 1) in einem Sammel-Call.
+
+        Args:
+            jobs: Liste von (image_path, base64_string, mime_type)
 
-        # Schritt 1: Strukturanalyse
-        structure_analysis = self.analyze_structure(image_b64, mime_type)
+        Returns:
+            Pro Board (structure_analysis, raw_content, raw_written) in Eingabe-Reihenfolge
+        """
+        images = [(image_b64, mime_type) for _, image_b64, mime_type in jobs]
+        results = self.analyze_and_transcribe_group(images)
+        return [
+            (structure_analysis, raw_content, self._writer.submit(
+                self._write_raw, image_path, structure_analysis, raw_content
+            ))
+            for (image_path, _, _), (structure_analysis, raw_content) in zip(jobs, results)
+        ]
 
-        # Schritt 2: Rohdaten-Transkription
-        raw_content = self.transcribe_raw(image_b64, mime_type, structure_analysis)
+    def _write_raw(self, image_path: Path, structure_analysis: str, raw_content: str) -> None:
+        """Speichert _Raw.md mit Header und Strukturanalyse."""
+        board_name = image_path.stem
+        raw_path, _ = self._output_paths(image_path)
 
-        # Raw.md speichern
         raw_header = (
             f"# Rohdaten-Transkription: {board_name}\n\n"
             f"**Erstellt:** {time.strftime('%Y-%m-%d %H:%M')}\n"
@@ -506,14 +1397,39 @@ class BoardDigitizer:
             f"---\n\n"
             f"## Transkription\n\n"
         )
-        raw_path.write_text(raw_header + raw_content, encoding="utf-8")
+        _write_atomic(raw_path, raw_header + raw_content)
         logger.info(f"Raw.md gespeichert: {raw_path}")
 
-        # Schritt 3: Bereinigung & Anreicherung
-        cleaned_content = self.clean_and_enrich(raw_content, structure_analysis)
+    def _text_stage(
+        self,
+        image_path: Path,
+        structure_analysis: str,
+        raw_content: str,
+        raw_written: Future,
+    ) -> tuple[Path, Path]:
+        """
+        Stufe 3: Bereinigung + Synthese (nur Text), speichert _Summary.md.
 
-        # Schritt 4: Synthese
-        summary_content = self.synthesize_summary(cleaned_content, structure_analysis)
+        Returns:
+            Tuple (raw_md_path, summary_md_path)
+        """
+        board_name = image_path.stem
+        raw_path, summary_path = self._output_paths(image_path)
+
+        if self.save_intermediate:
+            # Schritt 3: Bereinigung & Anreicherung (eigener Call, Ergebnis als _Clean.md)
+            cleaned_content = self.clean_and_enrich(raw_content, structure_analysis)
+            clean_path = self.output_dir / f"{board_name}_Clean.md"
+            _write_atomic(clean_path, cleaned_content)
+            logger.info(f"Clean.md gespeichert: {clean_path}")
+
+            # Schritt 4: Synthese
+            summary_content = self.synthesize_summary(cleaned_content, structure_analysis)
+        else:
+            # Schritt 3+4: Bereinigung und Synthese in einem Call
+            summary_content = self.synthesize_summary(
+                raw_content, structure_analysis, apply_cleanup=True
+            )
 
         # Summary.md speichern
         summary_header = (
@@ -523,17 +1439,235 @@ class BoardDigitizer:
             f"**Template:** {self.template}\n\n"
             f"---\n\n"
         )
-        summary_path.write_text(summary_header + summary_content, encoding="utf-8")
+        _write_atomic(summary_path, summary_header + summary_content)
         logger.info(f"Summary.md gespeichert: {summary_path}")
 
+        # Fehler beim Schreiben von Raw.md hier melden, das Board gilt sonst als fertig
+        raw_written.result()
+
         logger.info(f"Board erfolgreich verarbeitet: {board_name}")
         return raw_path, summary_path
 
+    def _staggered(self, stage: Callable[..., T], *args: Any) -> T:
+        """Führt eine Pipeline-Stufe nach kurzer Zufallspause aus (entzerrt Lastspitzen)."""
+        self._cancelled.wait(random.uniform(*self.STAGE_JITTER))
+        self._check_cancelled()
+        return stage(*args)
+
+    def process_board(self, image_path: Path) -> tuple[Path, Path]:
+        """
+        Orchestriert alle 4 Verarbeitungsschritte für ein Board-Foto.
+
+        Args:
+            image_path: Pfad zum Bild-File
+
+        Returns:
+            Tuple (raw_md_path, summary_md_path)
+
+        Raises:
+            ValueError: Bei nicht unterstütztem Dateiformat
+            FileNotFoundError: Wenn Bild nicht existiert
+        """
+        image_b64, mime_type, _ = self._encode_stage(image_path)
+        vision_result = self._vision_stage(image_path, image_b64, mime_type)
+        return self._text_stage(image_path, *vision_result)
+
+    def process_batch(
+        self,
+        image_paths: list[Path],
+    ) -> Iterator[tuple[Path, tuple[Path, Path] | Exception]]:
+        """
+        Verarbeitet mehrere Boards als Pipeline mit getrennten Worker-Pools.
+
+        Jedes Bild durchläuft Kodierung (CPU) → Vision-Calls → Text-Calls.
+        Die Stufen laufen überlappend, sodass CPU und Netzwerk gleichzeitig
+        ausgelastet sind, statt dass alle Worker im Gleichschritt dieselbe
+        Ressource beanspruchen.
+
+        Bei group_size > 1 werden kodierte Boards zu Sammel-Calls gebündelt;
+        scheitert ein Sammel-Call, laufen seine Boards einzeln weiter.
+
+        Inhaltsgleiche Bilder (gleicher Hash nach dem Kodieren) werden nur
+        einmal angefragt; Duplikate übernehmen Ergebnis bzw. Fehler des
+        Originals (siehe _copy_outputs()).
+
+        Kodiert wird nur, solange höchstens 2 × concurrency × group_size
+        Base64-Payloads auf ihren Vision-Call warten; große Ordner liegen so
+        nie komplett im Speicher. Bei Abbruch (Strg+C) werden wartende Jobs
+        verworfen statt abgearbeitet.
+
+        Args:
+            image_paths: Liste der Bild-Pfade
+
+        Yields:
+            Tuple (image_path, Ergebnis) in Fertigstellungs-Reihenfolge. Das
+            Ergebnis ist (raw_md_path, summary_md_path) oder die aufgetretene
+            Exception.
+        """
+        # Jitter entzerrt nur konkurrierende Boards; ein einzelnes Board startet sofort
+        run_stage: Callable[..., Any] = (
+            self._staggered if len(image_paths) > 1 else lambda stage, *args: stage(*args)
+        )
+        self._cancelled.clear()
+        encode_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="encode")
+        vision_pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="vision")
+        text_pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="text")
+        pools = (encode_pool, vision_pool, text_pool)
+        try:
+            # Future → (Stufe, Bild-Pfad bzw. Liste kodierter Boards bei "vision_group")
+            pending: dict[Future, tuple[str, Any]] = {}
+            encoded: list[tuple[Path, str, str]] = []
+
+            # Backpressure: Bilder werden erst kodiert, wenn weniger als max_in_flight
+            # Base64-Payloads (in Kodierung oder vor/in einem Vision-Call) im Speicher liegen
+            paths = iter(image_paths)
+            paths_left = True
+            in_flight = 0
+            encoding = 0
+            max_in_flight = 2 * self.concurrency * self.group_size
+
+            # Deduplizierung: Hash → Original, Original → wartende Duplikate bzw. Ergebnis
+            originals: dict[str, Path] = {}
+            duplicates: dict[Path, list[Path]] = {}
+            finished: dict[Path, tuple[Path, Path] | Exception] = {}
+
+            def submit_encodes() -> None:
+                nonlocal paths_left, in_flight, encoding
+                while paths_left and in_flight < max_in_flight:
+                    path = next(paths, None)
+                    if path is None:
+                        paths_left = False
+                        break
+                    future = encode_pool.submit(run_stage, self._encode_stage, path)
+                    pending[future] = ("encode", path)
+                    in_flight += 1
+                    encoding += 1
+
+            def submit_vision(job: tuple[Path, str, str]) -> None:
+                future = vision_pool.submit(run_stage, self._vision_stage, *job)
+                pending[future] = ("vision", job[0])
+
+            def resolve_duplicate(
+                original: Path, duplicate: Path
+            ) -> tuple[Path, tuple[Path, Path] | Exception]:
+                result = finished[original]
+                if not isinstance(result, Exception):
+                    try:
+                        result = self._copy_outputs(original, duplicate)
+                    except OSError as e:
+                        result = e
+                return duplicate, result
+
+            def finish(
+                image_path: Path, result: tuple[Path, Path] | Exception
+            ) -> Iterator[tuple[Path, tuple[Path, Path] | Exception]]:
+                yield image_path, result
+                finished[image_path] = result
+                for duplicate in duplicates.pop(image_path, []):
+                    yield resolve_duplicate(image_path, duplicate)
+
+            submit_encodes()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, target = pending.pop(future)
+                    error = future.exception()
+
+                    if stage == "encode":
+                        encoding -= 1
+                        if error is not None:
+                            in_flight -= 1
+                            yield target, error
+                            continue
+                        image_b64, mime_type, digest = future.result()
+                        original = originals.setdefault(digest, target)
+                        if original is target:
+                            encoded.append((target, image_b64, mime_type))
+                            continue
+                        in_flight -= 1
+                        if original in finished:
+                            yield resolve_duplicate(original, target)
+                        else:
+                            duplicates.setdefault(original, []).append(target)
+
+                    elif stage == "vision_group":
+                        if error is None:
+                            in_flight -= len(target)
+                            for (image_path, _, _), result in zip(target, future.result()):
+                                next_future = text_pool.submit(
+                                    run_stage, self._text_stage, image_path, *result
+                                )
+                                pending[next_future] = ("text", image_path)
+                        elif isinstance(error, UnrecoverableError) and not isinstance(
+                            error, VisionUnsupportedError
+                        ):
+                            in_flight -= len(target)
+                            for image_path, _, _ in target:
+                                yield from finish(image_path, error)
+                        else:
+                            logger.warning(
+                                f"Sammel-Call für {len(target)} Boards fehlgeschlagen ({error}). "
+                                "Verarbeite Boards einzeln."
+                            )
+                            for job in target:
+                                submit_vision(job)
+
+                    elif stage == "vision":
+                        in_flight -= 1
+                        if error is not None:
+                            yield from finish(target, error)
+                        else:
+                            next_future = text_pool.submit(
+                                run_stage, self._text_stage, target, *future.result()
+                            )
+                            pending[next_future] = ("text", target)
+
+                    elif error is not None:
+                        yield from finish(target, error)
+
+                    else:
+                        yield from finish(target, future.result())
+
+                submit_encodes()
+
+                # Volle Gruppen sofort abschicken, den Rest sobald nichts mehr kodiert wird
+                while encoded and (len(encoded) >= self.group_size or (encoding == 0 and not paths_left)):
+                    group, encoded = encoded[:self.group_size], encoded[self.group_size:]
+                    if len(group) == 1:
+                        submit_vision(group[0])
+                    else:
+                        next_future = vision_pool.submit(run_stage, self._vision_group_stage, group)
+                        pending[next_future] = ("vision_group", group)
+        except BaseException:
+            # Strg+C oder abgebrochene Iteration: Wartendes verwerfen, laufende Worker
+            # starten keine neuen Versuche mehr (siehe _check_cancelled())
+            self._cancelled.set()
+            for pool in pools:
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        for pool in pools:
+            pool.shutdown()
 
 # ---------------------------------------------------------------------------
 # CLI-Interface
 # ---------------------------------------------------------------------------
 
+def _positive_int(value: str) -> int:
+    """argparse-Typ für ganze Zahlen >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"Wert muss >= 1 sein: {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    """argparse-Typ für ganze Zahlen >= 0."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"Wert muss >= 0 sein: {value}")
+    return number
+
+
 def parse_args() -> argparse.Namespace:
     """Parst die Kommandozeilen-Argumente."""
     parser = argparse.ArgumentParser(
@@ -546,6 +1680,7 @@ Beispiele:
   python digitize_board.py --image board.jpg --template retrospektive
   python digitize_board.py --image board.jpg --context "Lager-Team, rote Punkte = Votes"
   python digitize_board.py --batch ./fotos/ --template ideensammlung
+  python digitize_board.py --batch ./fotos/ --concurrency 8
   python digitize_board.py --test
         """,
     )
@@ -598,12 +1733,56 @@ Beispiele:
         action="store_true",
         help="Markiert unsichere Erkennungen mit Konfidenz-Scores",
     )
+    parser.add_argument(
+        "--save-intermediate",
+        action="store_true",
+        help="Bereinigung als eigenen Schritt ausführen und als _Clean.md speichern (1 API-Call mehr pro Board)",
+    )
+    parser.add_argument(
+        "--max-dim",
+        type=_non_negative_int,
+        default=1600,
+        help="Bilder vor dem Upload auf diese Kantenlänge in Pixeln verkleinern (0 = Original senden, Standard: 1600)",
+    )
+    parser.add_argument(
+        "--jpeg-quality",
+        type=int,
+        choices=range(1, 96),
+        metavar="1-95",
+        default=85,
+        help="JPEG-Qualität für verkleinerte Bilder (Standard: 85)",
+    )
+    parser.add_argument(
+        "--detail",
+        choices=["low", "high"],
+        default="",
+        help="Vision-Detailstufe für den Provider (Standard: Provider-Automatik)",
+    )
+    parser.add_argument(
+        "--group-size", "-g",
+        type=_positive_int,
+        default=1,
+        help="Batch: so viele Boards pro Vision-Call bündeln (nur Modelle mit Multi-Bild-Support, Standard: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disk-Cache (OUTPUT_DIR/.cache) für Bilder und API-Antworten nicht verwenden",
+    )
+    parser.add_argument(
+        "--concurrency", "-j",
+        type=_positive_int,
+        default=4,
+        help="Anzahl parallel verarbeiteter Boards im Batch-Modus (Standard: 4)",
+    )
 
     return parser.parse_args()
 
 
 def run_connection_test(api_key: str, model: str) -> None:
     """Testet die API-Verbindung mit einer einfachen Text-Anfrage."""
+    import requests
+
     logger.info(f"Teste API-Verbindung mit Modell: {model}")
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -615,29 +1794,48 @@ def run_connection_test(api_key: str, model: str) -> None:
         "max_tokens": 10,
     }
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30,
-        )
+        with requests.Session() as session:
+            response = session.post(
+                BoardDigitizer.API_URL,
+                headers=headers,
+                data=orjson.dumps(payload),
+                timeout=30,
+            )
         response.raise_for_status()
-        answer = response.json()["choices"][0]["message"]["content"]
+        answer = orjson.loads(response.content)["choices"][0]["message"]["content"]
         print(f"\n✅ API-Verbindung erfolgreich! Antwort: {answer}")
         print(f"   Modell: {model}")
     except requests.exceptions.HTTPError as e:
-        status = e.response.status_code if e.response else "?"
-        print(f"\n❌ API-Fehler (HTTP {status}): {e.response.text if e.response else e}")
+        status = e.response.status_code if e.response is not None else "?"
+        print(f"\n❌ API-Fehler (HTTP {status}): {e.response.text if e.response is not None else e}")
     except Exception as e:
         print(f"\n❌ Verbindungsfehler: {e}")
 
 
+def find_images(batch_dir: Path) -> list[Path]:
+    """
+    Findet alle unterstützten Bilder in einem Ordner (nicht rekursiv).
+
+    Ein einziger Verzeichnis-Durchlauf; die Endung wird unabhängig von
+    Groß-/Kleinschreibung geprüft (.jpg, .JPG, .Jpg, ...).
+    """
+    with os.scandir(batch_dir) as entries:
+        return sorted(
+            Path(entry.path)
+            for entry in entries
+            if entry.is_file()
+            and os.path.splitext(entry.name)[1].lower() in BoardDigitizer.SUPPORTED_FORMATS
+        )
+
+
 def main() -> None:
     """Hauptfunktion: Parst Argumente, initialisiert BoardDigitizer und startet Verarbeitung."""
-    load_dotenv()
-
     args = parse_args()
 
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
     # Konfiguration aus Umgebung / .env
     api_key = os.getenv("OPENROUTER_API_KEY", "")
     if not api_key:
@@ -671,6 +1869,13 @@ def main() -> None:
         template=args.template,
         context=args.context,
         confidence=args.confidence,
+        concurrency=args.concurrency,
+        max_dim=args.max_dim,
+        jpeg_quality=args.jpeg_quality,
+        detail=args.detail,
+        cache=not args.no_cache,
+        group_size=args.group_size,
+        save_intermediate=args.save_intermediate,
     )
 
     # Bild-Liste bestimmen
@@ -683,10 +1888,7 @@ def main() -> None:
         if not batch_dir.is_dir():
             logger.error(f"Ordner nicht gefunden: {batch_dir}")
             sys.exit(1)
-        for fmt in BoardDigitizer.SUPPORTED_FORMATS:
-            images.extend(batch_dir.glob(f"*{fmt}"))
-            images.extend(batch_dir.glob(f"*{fmt.upper()}"))
-        images = sorted(set(images))
+        images = find_images(batch_dir)
         if not images:
             logger.error(f"Keine unterstützten Bilder in: {batch_dir}")
             sys.exit(1)
@@ -696,17 +1898,18 @@ def main() -> None:
     success_count = 0
     error_count = 0
 
-    for image_path in images:
-        try:
-            raw_path, summary_path = digitizer.process_board(image_path)
-            print(f"\n✅ {image_path.name}")
-            print(f"   Raw:     {raw_path}")
-            print(f"   Summary: {summary_path}")
-            success_count += 1
-        except Exception as e:
-            logger.error(f"Fehler bei {image_path.name}: {e}")
-            print(f"\n❌ {image_path.name}: {e}")
+    for image_path, result in digitizer.process_batch(images):
+        if isinstance(result, Exception):
+            logger.error(f"Fehler bei {image_path.name}: {result}")
+            print(f"\n❌ {image_path.name}: {result}")
             error_count += 1
+            continue
+
+        raw_path, summary_path = result
+        print(f"\n✅ {image_path.name}")
+        print(f"   Raw:     {raw_path}")
+        print(f"   Summary: {summary_path}")
+        success_count += 1
 
     # Abschlussbericht
     if len(images) > 1: